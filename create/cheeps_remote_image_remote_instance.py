@@ -74,7 +74,7 @@ class CheepsDeviceFactory(base_device_factory.BaseDeviceFactory):
         _build_id: String, Build id, e.g. "2263051", "P2804227"
 
     """
-    LOG_FILES = []
+    LOG_FILES = ()
 
     def __init__(self, cfg, build_id, avd_spec=None):
         """Initialize.
@@ -17,7 +17,6 @@
 
 from __future__ import print_function
 
-import glob
 import logging
 import os
 import tempfile
@@ -31,6 +30,7 @@ from acloud.internal.lib import utils
 logger = logging.getLogger(__name__)
 
 _ACLOUD_IMAGE_ZIP_POSTFIX = "-local-img-%s.zip"
+_IMAGE_FILE_EXT = ".img"
 
 
 def ParseHWPropertyArgs(dict_str, item_separator=",", key_value_separator=":"):
@@ -94,8 +94,12 @@ def ZipCFImageFiles(basedir):
 
     zip_file = zipfile.ZipFile(archive_file, 'w', zipfile.ZIP_DEFLATED,
                                allowZip64=True)
+    # A single listdir pass is enough for the lone "*.img" pattern, there's
+    # no need to go through glob's fnmatch machinery.
     required_files = ([os.path.join(basedir, "android-info.txt")] +
-                      glob.glob(os.path.join(basedir, "*.img")))
+                      [os.path.join(basedir, name)
+                       for name in sorted(os.listdir(basedir))
+                       if name.endswith(_IMAGE_FILE_EXT)])
     logger.debug("archiving images: %s", required_files)
 
     for f in required_files:
@@ -29,10 +29,13 @@ from acloud.internal.lib import driver_test_lib
 class FakeZipFile(object):
     """Fake implementation of ZipFile()"""
 
-    # pylint: disable=invalid-name,unused-argument,no-self-use
+    def __init__(self):
+        self.arcnames = []
+
+    # pylint: disable=invalid-name,unused-argument
     def write(self, filename, arcname=None, compress_type=None):
         """Fake write method."""
-        return
+        self.arcnames.append(arcname)
 
     # pylint: disable=invalid-name,no-self-use
     def close(self):
@@ -76,14 +79,19 @@ class CreateCommonTest(driver_test_lib.BaseDriverTest):
                           fake_image_path)
 
         # Test should get archive name by timestamp if zip file does not exist.
-        self.Patch(zipfile, "ZipFile", return_value=FakeZipFile())
+        fake_zip_file = FakeZipFile()
+        self.Patch(zipfile, "ZipFile", return_value=fake_zip_file)
         self.Patch(os.path, "exists", return_value=False)
+        self.Patch(os, "listdir",
+                   return_value=["system.img", "boot.img", "fake.txt"])
         self.Patch(os.environ, "get", return_value="fake_build_target")
         self.Patch(time, "time", return_value=12345)
         self.Patch(tempfile, "gettempdir", return_value="/fake_temp")
         self.assertEqual(create_common.ZipCFImageFiles(fake_image_path),
                          "/fake_temp/%s/fake_build_target-local-12345.zip" %
                          constants.TEMP_ARTIFACTS_FOLDER)
+        self.assertEqual(fake_zip_file.arcnames,
+                         ["android-info.txt", "boot.img", "system.img"])
 
 
 if __name__ == "__main__":
@@ -23,7 +23,11 @@ from distutils.spawn import find_executable
 import getpass
 import logging
 import os
+import pipes
+import re
+import shutil
 import subprocess
+import tempfile
 
 from acloud import errors
 from acloud.create import base_avd_create
@@ -45,12 +49,27 @@ _CMD_LAUNCH_CVD_ARGS = (" -cpus %s -x_res %s -y_res %s -dpi %s "
 #Output to Serial port 1 (console) group in the instance
 _OUTPUT_CONSOLE_GROUPS = "tty"
 SSH_BIN = "ssh"
-_SSH_CMD = (" -i %(rsa_key_file)s "
-            "-q -o UserKnownHostsFile=/dev/null -o StrictHostKeyChecking=no "
-            "-l %(login_user)s %(ip_addr)s ")
+# All ssh commands to the instance share one multiplexed connection, so only
+# the first one pays for the TCP and auth handshake.
+_SSH_OPTIONS = ("-q", "-o", "UserKnownHostsFile=/dev/null",
+                "-o", "StrictHostKeyChecking=no", "-o", "ControlMaster=auto")
+# The control socket lives in a private dir made per instance, ssh must not
+# use a socket another user could create first. %C is expanded by ssh to a
+# hash of the connection's host, port and user.
+_SSH_CONTROL_DIR_PREFIX = "acloud-ssh-"
+_SSH_CONTROL_SOCKET = "%C"
+# ssh exits if the socket path doesn't fit in sun_path (104 bytes on macOS,
+# 108 on Linux). %C expands to 40 chars and ssh adds a 17 char suffix while
+# it binds the socket. Longer temp dirs go without multiplexing.
+_UNIX_SOCKET_PATH_MAX = 104
+_SSH_CONTROL_SOCKET_LEN = 1 + 40 + 17
+_SSH_CONTROL_PERSIST_SECS = 60
 _SSH_CMD_MAX_RETRY = 2
 _SSH_CMD_RETRY_SLEEP = 3
 _USER_BUILD = "userbuild"
+# The build target is the part of the image file name before the first "-",
+# e.g. aosp_cf_x86_phone-img-eng.user.zip.
+_RE_IMAGE_BUILD_TARGET = re.compile(r"^(?P<build_target>[^-]*)-")
 
 class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
     """A class that can produce a cuttlefish device.
@@ -76,6 +95,7 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
         super(RemoteInstanceDeviceFactory, self).__init__(compute_client)
         # Private creation parameters
         self._ssh_cmd = None
+        self._ssh_control_dir = None
 
     def CreateInstance(self):
         """Create a single configured cuttlefish device.
@@ -88,16 +108,52 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
         Returns:
             A string, representing instance name.
         """
-        instance = self._CreateGceInstance()
-        self._SetAVDenv(_CVD_USER)
-        self._UploadArtifacts(_CVD_USER,
-                              self._local_image_artifact,
-                              self._cvd_host_package_artifact)
-        self._LaunchCvd(_CVD_USER, self._avd_spec.hw_property)
+        try:
+            instance = self._CreateGceInstance()
+            self._SetAVDenv(_CVD_USER)
+            self._UploadArtifacts(_CVD_USER,
+                                  self._local_image_artifact,
+                                  self._cvd_host_package_artifact)
+            self._LaunchCvd(_CVD_USER, self._avd_spec.hw_property)
+        finally:
+            self._CloseSshControlMaster()
         return instance
 
+    def _CreateSshControlPath(self):
+        """Create a private dir for the ssh control socket.
+
+        mkdtemp creates the dir 0700, only we can put a socket in it.
+
+        Returns:
+            String, the ssh ControlPath, "none" if the socket path would be
+            too long for ssh to bind.
+        """
+        control_dir = tempfile.mkdtemp(prefix=_SSH_CONTROL_DIR_PREFIX)
+        if len(control_dir) + _SSH_CONTROL_SOCKET_LEN >= _UNIX_SOCKET_PATH_MAX:
+            logger.debug("Temp dir %s is too long for an ssh control socket, "
+                         "not sharing the ssh connection.", control_dir)
+            os.rmdir(control_dir)
+            return "none"
+        self._ssh_control_dir = control_dir
+        return os.path.join(control_dir, _SSH_CONTROL_SOCKET)
+
+    def _CloseSshControlMaster(self):
+        """Stop the ssh master connection and remove its socket dir.
+
+        Otherwise the master would linger for ControlPersist seconds with
+        nothing able to reach it. launch_cvd's ssh doesn't go through it.
+        """
+        if not self._ssh_control_dir:
+            return
+        with open(os.devnull, "w") as dev_null:
+            # Fails harmlessly if no master was ever started.
+            subprocess.call(self._ssh_cmd[:1] + ["-O", "exit"] +
+                            self._ssh_cmd[1:], stderr=dev_null)
+        shutil.rmtree(self._ssh_control_dir, ignore_errors=True)
+        self._ssh_control_dir = None
+
     @staticmethod
-    def _ShellCmdWithRetry(remote_cmd):
+    def _ShellCmdWithRetry(remote_cmd, stdin_path=None):
         """Runs a shell command on remote device.
 
         If the network is unstable and causes SSH connect fail, it will retry.
@@ -106,7 +162,11 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
         failure is times * retries.
 
         Args:
-            remote_cmd: A string, shell command to be run on remote.
+            remote_cmd: A list of strings, the ssh command line to run. It's
+                        executed directly, without going through a local
+                        shell.
+            stdin_path: String, path of a local file to feed to the command's
+                        stdin. It's reopened on every retry.
 
         Raises:
             subprocess.CalledProcessError: For any non-zero return code of
@@ -115,10 +175,17 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
         Returns:
             Boolean, True if the command was successfully executed. False otherwise.
         """
+        def _Run(cmd):
+            """Run cmd once, with stdin_path as its stdin if given."""
+            if not stdin_path:
+                return subprocess.check_call(cmd)
+            with open(stdin_path, "rb") as stdin:
+                return subprocess.check_call(cmd, stdin=stdin)
+
         return utils.RetryExceptionType(
             exception_types=subprocess.CalledProcessError,
             max_retries=_SSH_CMD_MAX_RETRY,
-            functor=lambda cmd: subprocess.check_call(cmd, shell=True),
+            functor=_Run,
             sleep_multiplier=_SSH_CMD_RETRY_SLEEP,
             retry_backoff_factor=utils.DEFAULT_RETRY_BACKOFF_FACTOR,
             cmd=remote_cmd)
@@ -135,9 +202,10 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
         Returns:
             A string, representing instance name.
         """
-        image_name = os.path.basename(self._local_image_artifact)
-        build_target = self._avd_spec.flavor if "-" not in image_name else image_name.split(
-            "-")[0]
+        match = _RE_IMAGE_BUILD_TARGET.match(
+            os.path.basename(self._local_image_artifact))
+        build_target = (match.group("build_target") if match
+                        else self._avd_spec.flavor)
         instance = self._compute_client.GenerateInstanceName(
             build_target=build_target, build_id=_USER_BUILD)
         # Create an instance from Stable Host Image
@@ -148,28 +216,40 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
             blank_data_disk_size_gb=self._cfg.extra_data_disk_size_gb,
             avd_spec=self._avd_spec)
         ip = self._compute_client.GetInstanceIP(instance)
-        self._ssh_cmd = find_executable(SSH_BIN) + _SSH_CMD % {
-            "login_user": getpass.getuser(),
-            "rsa_key_file": self._cfg.ssh_private_key_path,
-            "ip_addr": (ip.internal if self._report_internal_ip
-                        else ip.external)}
+        control_path = self._CreateSshControlPath()
+        # Build the argv from its elements, paths may contain spaces.
+        self._ssh_cmd = (
+            [find_executable(SSH_BIN), "-i", self._cfg.ssh_private_key_path] +
+            list(_SSH_OPTIONS) +
+            ["-o", "ControlPath=%s" % control_path,
+             "-o", "ControlPersist=%d" % _SSH_CONTROL_PERSIST_SECS,
+             "-l", getpass.getuser(),
+             ip.internal if self._report_internal_ip else ip.external])
         return instance
 
     @utils.TimeExecute(function_description="Setting up GCE environment")
     def _SetAVDenv(self, cvd_user):
         """set the user to run AVD in the instance.
 
+        The stable host image must have all of constants.LIST_CF_USER_GROUPS
+        and the console group. usermod adds them in one call and fails as a
+        whole if any of them is missing, which aborts the create.
+
         Args:
             cvd_user: A string, user run the cvd in the instance.
+
+        Raises:
+            subprocess.CalledProcessError: usermod failed, e.g. a group
+                                           doesn't exist on the instance.
         """
         avd_list_of_groups = []
         avd_list_of_groups.extend(constants.LIST_CF_USER_GROUPS)
         avd_list_of_groups.append(_OUTPUT_CONSOLE_GROUPS)
-        remote_cmd = ""
-        for group in avd_list_of_groups:
-            remote_cmd += "\"sudo usermod -aG %s %s;\"" %(group, cvd_user)
+        # usermod takes a comma separated group list, one call adds them all.
+        remote_cmd = "sudo usermod -aG %s %s" % (",".join(avd_list_of_groups),
+                                                 pipes.quote(cvd_user))
         logger.debug("remote_cmd:\n %s", remote_cmd)
-        self._ShellCmdWithRetry(self._ssh_cmd + remote_cmd)
+        self._ShellCmdWithRetry(self._ssh_cmd + [remote_cmd])
 
     @utils.TimeExecute(function_description="Uploading local image")
     def _UploadArtifacts(self,
@@ -184,16 +264,17 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
             cvd_host_package_artifact: A string, path to cvd host package.
         """
         # TODO(b/129376163) Use lzop for fast sparse image upload
-        remote_cmd = ("\"sudo su -c '/usr/bin/install_zip.sh .' - '%s'\" < %s" %
-                      (cvd_user, local_image_artifact))
+        remote_cmd = ("sudo su -c '/usr/bin/install_zip.sh .' - %s" %
+                      pipes.quote(cvd_user))
         logger.debug("remote_cmd:\n %s", remote_cmd)
-        self._ShellCmdWithRetry(self._ssh_cmd + remote_cmd)
+        self._ShellCmdWithRetry(self._ssh_cmd + [remote_cmd],
+                                stdin_path=local_image_artifact)
 
         # host_package
-        remote_cmd = ("\"sudo su -c 'tar -x -z -f -' - '%s'\" < %s" %
-                      (cvd_user, cvd_host_package_artifact))
+        remote_cmd = "sudo su -c 'tar -x -z -f -' - %s" % pipes.quote(cvd_user)
         logger.debug("remote_cmd:\n %s", remote_cmd)
-        self._ShellCmdWithRetry(self._ssh_cmd + remote_cmd)
+        self._ShellCmdWithRetry(self._ssh_cmd + [remote_cmd],
+                                stdin_path=cvd_host_package_artifact)
 
     def _LaunchCvd(self, cvd_user, hw_property):
         """Launch CVD."""
@@ -204,10 +285,15 @@ class RemoteInstanceDeviceFactory(base_device_factory.BaseDeviceFactory):
             hw_property["dpi"],
             hw_property["memory"],
             hw_property["disk"])
-        remote_cmd = ("\"sudo su -c 'bin/launch_cvd %s>&/dev/ttyS0&' - '%s'\"" %
-                      (lunch_cvd_args, cvd_user))
+        remote_cmd = "sudo su -c %s - %s" % (
+            pipes.quote("bin/launch_cvd %s>&/dev/ttyS0&" % lunch_cvd_args),
+            pipes.quote(cvd_user))
         logger.debug("remote_cmd:\n %s", remote_cmd)
-        subprocess.Popen(self._ssh_cmd + remote_cmd, shell=True)
+        # launch_cvd's ssh is left running, keep it off the control socket so
+        # the socket dir can be removed right away. ssh uses the first value
+        # given for an option.
+        subprocess.Popen(self._ssh_cmd[:1] + ["-o", "ControlPath=none"] +
+                         self._ssh_cmd[1:] + [remote_cmd])
 
 
 class LocalImageRemoteInstance(base_avd_create.BaseAVDCreate):
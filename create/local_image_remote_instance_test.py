@@ -22,7 +22,10 @@ import uuid
 
 import glob
 import os
+import shutil
+import stat
 import subprocess
+import tempfile
 import time
 import unittest
 
@@ -86,6 +89,24 @@ class RemoteInstanceDeviceFactoryTest(driver_test_lib.BaseDriverTest):
         self.Patch(auth, "CreateCredentials", return_value=mock.MagicMock())
         self.Patch(cvd_compute_client.CvdComputeClient, "InitResourceHandle")
 
+    # pylint: disable=protected-access
+    def _CreateFactory(self, local_image_artifact=None):
+        """Create a factory with fake clients and ssh calls.
+
+        Args:
+            local_image_artifact: A string, path to local image.
+
+        Returns:
+            A RemoteInstanceDeviceFactory whose ssh command is ["ssh"] and
+            whose _ShellCmdWithRetry is mocked.
+        """
+        self.Patch(cvd_compute_client, "CvdComputeClient")
+        factory = local_image_remote_instance.RemoteInstanceDeviceFactory(
+            mock.MagicMock(), local_image_artifact, "/fake/host_package.tar.gz")
+        factory._ssh_cmd = ["ssh"]
+        self.Patch(factory, "_ShellCmdWithRetry")
+        return factory
+
     # pylint: disable=protected-access
     def testSSHExecuteWithRetry(self):
         """test SSHExecuteWithRetry method."""
@@ -96,11 +117,22 @@ class RemoteInstanceDeviceFactoryTest(driver_test_lib.BaseDriverTest):
                        None, "ssh command fail."))
         self.assertRaises(subprocess.CalledProcessError,
                           factory._ShellCmdWithRetry,
-                          "fake cmd")
+                          ["ssh", "fake cmd"])
         self.assertEqual(subprocess.check_call.call_count, #pylint: disable=no-member
                          local_image_remote_instance._SSH_CMD_MAX_RETRY + 1)
         self.Patch(subprocess, "check_call", return_value=True)
-        self.assertEqual(factory._ShellCmdWithRetry("fake cmd"), True)
+        self.assertEqual(factory._ShellCmdWithRetry(["ssh", "fake cmd"]), True)
+        subprocess.check_call.assert_called_once_with(  #pylint: disable=no-member
+            ["ssh", "fake cmd"])
+
+        # stdin_path is opened as the command's stdin.
+        m = mock.mock_open()
+        with mock.patch("__builtin__.open", m):
+            factory._ShellCmdWithRetry(["ssh", "fake cmd"],
+                                       stdin_path="/fake/file")
+        m.assert_called_once_with("/fake/file", "rb")
+        subprocess.check_call.assert_called_with(  #pylint: disable=no-member
+            ["ssh", "fake cmd"], stdin=m.return_value)
 
     # pylint: disable=protected-access
     def testCreateGceInstanceName(self):
@@ -117,6 +149,7 @@ class RemoteInstanceDeviceFactoryTest(driver_test_lib.BaseDriverTest):
         args.flavor = "phone"
         args.local_image = None
         fake_avd_spec = avd_spec.AVDSpec(args)
+        fake_avd_spec.cfg.ssh_private_key_path = "/fake dir/acloud_rsa"
 
         fake_uuid = mock.MagicMock(hex="1234")
         self.Patch(uuid, "uuid4", return_value=fake_uuid)
@@ -129,6 +162,20 @@ class RemoteInstanceDeviceFactoryTest(driver_test_lib.BaseDriverTest):
             fake_image_name,
             fake_host_package_name)
         self.assertEqual(factory._CreateGceInstance(), "ins-1234-userbuild-aosp-cf-x86-phone")
+        self.assertIn("ControlMaster=auto", factory._ssh_cmd)
+        # A path with a space stays a single argument.
+        key_index = factory._ssh_cmd.index("-i") + 1
+        self.assertEqual(factory._ssh_cmd[key_index], "/fake dir/acloud_rsa")
+        # The control socket sits in a private dir, and its expanded path
+        # fits in a unix socket address.
+        control_dir = factory._ssh_control_dir
+        self.addCleanup(shutil.rmtree, control_dir)
+        self.assertIn("ControlPath=%s" % os.path.join(control_dir, "%C"),
+                      factory._ssh_cmd)
+        self.assertEqual(stat.S_IMODE(os.stat(control_dir).st_mode), 0o700)
+        self.assertLess(
+            len(control_dir) + local_image_remote_instance._SSH_CONTROL_SOCKET_LEN,
+            local_image_remote_instance._UNIX_SOCKET_PATH_MAX)
 
         fake_image_name = "/fake/aosp_cf_x86_phone.username.zip"
         factory = local_image_remote_instance.RemoteInstanceDeviceFactory(
@@ -136,6 +183,84 @@ class RemoteInstanceDeviceFactoryTest(driver_test_lib.BaseDriverTest):
             fake_image_name,
             fake_host_package_name)
         self.assertEqual(factory._CreateGceInstance(), "ins-1234-userbuild-phone")
+        self.addCleanup(shutil.rmtree, factory._ssh_control_dir)
+
+    # pylint: disable=protected-access
+    def testCreateSshControlPathTooLong(self):
+        """Test a too long temp dir disables ssh connection sharing."""
+        factory = self._CreateFactory()
+        long_dir = tempfile.mkdtemp(dir=tempfile.mkdtemp(prefix="x" * 100))
+        self.addCleanup(shutil.rmtree, os.path.dirname(long_dir))
+        self.Patch(tempfile, "mkdtemp", return_value=long_dir)
+        self.assertEqual(factory._CreateSshControlPath(), "none")
+        self.assertIsNone(factory._ssh_control_dir)
+        self.assertFalse(os.path.exists(long_dir))
+
+    # pylint: disable=protected-access
+    def testCreateInstanceClosesControlMaster(self):
+        """Test CreateInstance stops the ssh master, even on failure."""
+        factory = self._CreateFactory()
+        control_dir = tempfile.mkdtemp()
+
+        def _FakeCreateGceInstance():
+            """Pretend to set up the control dir like _CreateGceInstance."""
+            factory._ssh_control_dir = control_dir
+            factory._ssh_cmd = ["ssh", "-l", "user", "1.1.1.1"]
+            return "fake_instance"
+
+        def _FakeCall(cmd, stderr):
+            """The master must be stopped before its socket dir goes away."""
+            del cmd, stderr
+            self.assertTrue(os.path.exists(control_dir))
+            return 0
+
+        self.Patch(factory, "_CreateGceInstance",
+                   side_effect=_FakeCreateGceInstance)
+        self.Patch(factory, "_SetAVDenv",
+                   side_effect=subprocess.CalledProcessError(1, "ssh"))
+        self.Patch(subprocess, "call", side_effect=_FakeCall)
+        self.assertRaises(subprocess.CalledProcessError,
+                          factory.CreateInstance)
+        subprocess.call.assert_called_once_with(  #pylint: disable=no-member
+            ["ssh", "-O", "exit", "-l", "user", "1.1.1.1"],
+            stderr=mock.ANY)
+        self.assertFalse(os.path.exists(control_dir))
+        self.assertIsNone(factory._ssh_control_dir)
+
+    # pylint: disable=protected-access
+    def testSetAVDenv(self):
+        """Test _SetAVDenv adds the user to all groups with one usermod."""
+        factory = self._CreateFactory()
+        factory._SetAVDenv("fake_user")
+        factory._ShellCmdWithRetry.assert_called_once_with(
+            ["ssh", "sudo usermod -aG kvm,cvdnetwork,tty fake_user"])
+
+    # pylint: disable=protected-access
+    def testUploadArtifacts(self):
+        """Test _UploadArtifacts feeds the artifacts to ssh's stdin."""
+        factory = self._CreateFactory("/fake/image.zip")
+        factory._UploadArtifacts("fake_user", "/fake/image.zip",
+                                 "/fake/host_package.tar.gz")
+        factory._ShellCmdWithRetry.assert_any_call(
+            ["ssh", "sudo su -c '/usr/bin/install_zip.sh .' - fake_user"],
+            stdin_path="/fake/image.zip")
+        factory._ShellCmdWithRetry.assert_any_call(
+            ["ssh", "sudo su -c 'tar -x -z -f -' - fake_user"],
+            stdin_path="/fake/host_package.tar.gz")
+
+    # pylint: disable=protected-access
+    def testLaunchCvd(self):
+        """Test _LaunchCvd quotes the launch_cvd command and the user."""
+        self.Patch(subprocess, "Popen")
+        factory = self._CreateFactory()
+        hw_property = {"cpu": "2", "x_res": "1080", "y_res": "1920",
+                       "dpi": "240", "memory": "4096", "disk": "4096"}
+        factory._LaunchCvd("fake user", hw_property)
+        subprocess.Popen.assert_called_once_with(  #pylint: disable=no-member
+            ["ssh", "-o", "ControlPath=none",
+             "sudo su -c 'bin/launch_cvd  -cpus 2 -x_res 1080 "
+             "-y_res 1920 -dpi 240 -memory_mb 4096 -blank_data_image_mb 4096 "
+             "-data_policy always_create >&/dev/ttyS0&' - 'fake user'"])
 
 if __name__ == "__main__":
     unittest.main()
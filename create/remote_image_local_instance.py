@@ -19,11 +19,14 @@ Create class that is responsible for creating a local instance AVD with a
 remote image.
 """
 from __future__ import print_function
+import errno
 import glob
 import logging
 import os
+import pipes
 import subprocess
 import sys
+import threading
 
 from acloud import errors
 from acloud.create import local_image_local_instance
@@ -53,6 +56,7 @@ UNPACK_BOOTIMG_CMD = "%s -boot_img %s" % (
     os.path.join(_CUTTLEFISH_COMMON_BIN_PATH, "unpack_boot_image.py"),
     "%s -dest %s")
 ACL_CMD = "setfacl -m g:libvirt-qemu:rw %s"
+_THREAD_JOIN_POLL_SECS = 1
 
 logger = logging.getLogger(__name__)
 
@@ -119,18 +123,29 @@ class RemoteImageLocalInstance(local_image_local_instance.LocalImageLocalInstanc
         logger.debug("Extract path: %s", extract_path)
         # TODO(b/117189191): If extract folder exists, check if the files are
         # already downloaded and skip this step if they are.
-        if not os.path.exists(extract_path):
+        # Let makedirs tell us whether the folder exists, one syscall instead
+        # of a stat followed by a mkdir.
+        try:
             os.makedirs(extract_path)
-            self._DownloadRemoteImage(cfg, build_target, build_id, extract_path)
-            self._UnpackBootImage(extract_path)
-            self._AclCfImageFiles(extract_path)
-
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+            return extract_path
+
+        self._DownloadRemoteImage(cfg, build_target, build_id, extract_path)
+        self._UnpackBootImage(extract_path)
+        self._AclCfImageFiles(extract_path)
         return extract_path
 
     @staticmethod
     def _DownloadRemoteImage(cfg, build_target, build_id, extract_path):
         """Download cuttlefish package and remote image then extract them.
 
+        The host package is fetched in a background thread while the image
+        zip is fetched in the calling thread, so the two downloads overlap.
+        httplib2 isn't thread-safe, hence each thread gets its own build
+        client; the credentials are shared.
+
         Args:
             cfg: An AcloudConfig instance.
             build_target: String, the build target, e.g. cf_x86_phone-userdebug.
@@ -139,23 +154,62 @@ class RemoteImageLocalInstance(local_image_local_instance.LocalImageLocalInstanc
         """
         remote_image = "%s-img-%s.zip" % (build_target.split('-')[0],
                                           build_id)
-        artifacts = [_CVD_HOST_PACKAGE, remote_image]
-
-        build_client = android_build_client.AndroidBuildClient(
-            auth.CreateCredentials(cfg))
-        for artifact in artifacts:
-            temp_filename = os.path.join(extract_path, artifact)
-            build_client.DownloadArtifact(
-                build_target,
-                build_id,
-                artifact,
-                temp_filename)
-            utils.Decompress(temp_filename, extract_path)
+        credentials = auth.CreateCredentials(cfg)
+        host_package_failures = []
+
+        def _DownloadHostPackage():
+            """Download the host package, keep the failure for the caller."""
             try:
-                os.remove(temp_filename)
-                logger.debug("Deleted temporary file %s", temp_filename)
-            except OSError as e:
-                logger.error("Failed to delete temporary file: %s", str(e))
+                RemoteImageLocalInstance._DownloadArtifact(
+                    credentials, build_target, build_id, _CVD_HOST_PACKAGE,
+                    extract_path)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error("Failed to download %s: %s", _CVD_HOST_PACKAGE,
+                             str(e))
+                host_package_failures.append(sys.exc_info())
+
+        host_package_thread = threading.Thread(target=_DownloadHostPackage)
+        # Don't keep the process alive for it if the user interrupts us.
+        host_package_thread.daemon = True
+        host_package_thread.start()
+        try:
+            RemoteImageLocalInstance._DownloadArtifact(
+                credentials, build_target, build_id, remote_image, extract_path)
+        finally:
+            # Don't leave the thread writing into extract_path after we
+            # fail. A join without timeout can't be interrupted by Ctrl-C in
+            # Python 2.
+            while host_package_thread.is_alive():
+                host_package_thread.join(_THREAD_JOIN_POLL_SECS)
+        if host_package_failures:
+            exc_type, exc_value, exc_traceback = host_package_failures[0]
+            raise exc_type, exc_value, exc_traceback
+
+    @staticmethod
+    def _DownloadArtifact(credentials, build_target, build_id, artifact,
+                          extract_path):
+        """Download an artifact, extract it and delete the downloaded file.
+
+        Args:
+            credentials: An oauth2client.OAuth2Credentials instance.
+            build_target: String, the build target, e.g. cf_x86_phone-userdebug.
+            build_id: String, Build id, e.g. "2263051", "P2804227"
+            artifact: String, name of the artifact to download.
+            extract_path: String, a path include extracted files.
+        """
+        build_client = android_build_client.AndroidBuildClient(credentials)
+        temp_filename = os.path.join(extract_path, artifact)
+        build_client.DownloadArtifact(
+            build_target,
+            build_id,
+            artifact,
+            temp_filename)
+        utils.Decompress(temp_filename, extract_path)
+        try:
+            os.remove(temp_filename)
+            logger.debug("Deleted temporary file %s", temp_filename)
+        except OSError as e:
+            logger.error("Failed to delete temporary file: %s", str(e))
 
     @staticmethod
     def _UnpackBootImage(extract_path):
@@ -176,7 +230,8 @@ class RemoteImageLocalInstance(local_image_local_instance.LocalImageLocalInstanc
         logger.info("Start to unpack boot.img.")
         try:
             subprocess.check_call(
-                UNPACK_BOOTIMG_CMD % (bootimg_path, extract_path),
+                UNPACK_BOOTIMG_CMD % (pipes.quote(bootimg_path),
+                                      pipes.quote(extract_path)),
                 shell=True)
         except subprocess.CalledProcessError as e:
             raise errors.UnpackBootImageError(
@@ -196,7 +251,8 @@ class RemoteImageLocalInstance(local_image_local_instance.LocalImageLocalInstanc
         image_list = glob.glob(os.path.join(extract_path, "*.img"))
         logger.info("Start to set ACLs on files: %s", ",".join(image_list))
         for image_path in image_list:
-            subprocess.check_call(ACL_CMD % image_path, shell=True)
+            subprocess.check_call(ACL_CMD % pipes.quote(image_path),
+                                  shell=True)
         logger.info("The ACLs have set completed!")
 
     @staticmethod
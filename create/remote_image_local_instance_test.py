@@ -13,10 +13,14 @@
 # limitations under the License.
 """Tests for remote_image_local_instance."""
 
+import errno
 import unittest
 from collections import namedtuple
 import os
 import subprocess
+import sys
+import time
+import traceback
 import mock
 
 from acloud import errors
@@ -73,7 +77,6 @@ class RemoteImageLocalInstanceTest(driver_test_lib.BaseDriverTest):
         avd_spec.cfg = mock.MagicMock()
         avd_spec.remote_image = self._fake_remote_image
         avd_spec.image_download_dir = "/tmp"
-        self.Patch(os.path, "exists", return_value=False)
         self.Patch(os, "makedirs")
         self.RemoteImageLocalInstance._DownloadAndProcessImageFiles(avd_spec)
 
@@ -86,6 +89,14 @@ class RemoteImageLocalInstanceTest(driver_test_lib.BaseDriverTest):
         mock_unpack.assert_called_once_with(self._extract_path)
         mock_acl.assert_called_once_with(self._extract_path)
 
+        # Skip the download when the extract folder already exists.
+        mock_download.reset_mock()
+        self.Patch(os, "makedirs", side_effect=OSError(errno.EEXIST, "exists"))
+        self.assertEqual(
+            self.RemoteImageLocalInstance._DownloadAndProcessImageFiles(avd_spec),
+            self._extract_path)
+        mock_download.assert_not_called()
+
     @mock.patch.object(utils, "Decompress")
     def testDownloadRemoteImage(self, mock_decompress):
         """Test Download cuttlefish package."""
@@ -115,6 +126,67 @@ class RemoteImageLocalInstanceTest(driver_test_lib.BaseDriverTest):
         # To validate Decompress runs twice.
         self.assertEqual(mock_decompress.call_count, 2)
 
+    @mock.patch.object(utils, "Decompress")
+    def testDownloadRemoteImageHostPackageFailure(self, mock_decompress):
+        """Test a host package download failure is raised to the caller."""
+        def _FakeDownload(build_target, build_id, resource_id, local_dest):
+            """Fail on the host package only."""
+            del build_target, build_id, local_dest
+            if resource_id == "cvd-host_package.tar.gz":
+                raise errors.DriverError("download failed")
+
+        self.build_client.DownloadArtifact.side_effect = _FakeDownload
+        self.assertRaises(errors.DriverError,
+                          self.RemoteImageLocalInstance._DownloadRemoteImage,
+                          mock.MagicMock(), "aosp_cf_x86_phone-userdebug",
+                          "1234", self._extract_path)
+        # Only the image zip made it to Decompress.
+        mock_decompress.assert_called_once_with(
+            "%s/aosp_cf_x86_phone-img-1234.zip" % self._extract_path,
+            self._extract_path)
+
+    @mock.patch.object(utils, "Decompress")
+    def testDownloadRemoteImageHostPackageTraceback(self, mock_decompress):
+        """Test a host package failure keeps its original traceback."""
+        del mock_decompress
+        def _FakeDownload(build_target, build_id, resource_id, local_dest):
+            """Fail on the host package only."""
+            del build_target, build_id, local_dest
+            if resource_id == "cvd-host_package.tar.gz":
+                raise errors.DriverError("download failed")
+
+        self.build_client.DownloadArtifact.side_effect = _FakeDownload
+        try:
+            self.RemoteImageLocalInstance._DownloadRemoteImage(
+                mock.MagicMock(), "aosp_cf_x86_phone-userdebug", "1234",
+                self._extract_path)
+        except errors.DriverError:
+            frames = traceback.extract_tb(sys.exc_info()[2])
+            self.assertEqual(frames[-1][2], "_FakeDownload")
+        else:
+            self.fail("DriverError not raised")
+
+    @mock.patch.object(utils, "Decompress")
+    def testDownloadRemoteImageWaitsForHostPackage(self, mock_decompress):
+        """Test an image zip failure waits for the host package thread."""
+        def _FakeDownload(build_target, build_id, resource_id, local_dest):
+            """Fail on the image zip, be slow on the host package."""
+            del build_target, build_id, local_dest
+            if resource_id == "cvd-host_package.tar.gz":
+                time.sleep(0.1)
+            else:
+                raise errors.DriverError("download failed")
+
+        self.build_client.DownloadArtifact.side_effect = _FakeDownload
+        self.assertRaises(errors.DriverError,
+                          self.RemoteImageLocalInstance._DownloadRemoteImage,
+                          mock.MagicMock(), "aosp_cf_x86_phone-userdebug",
+                          "1234", self._extract_path)
+        # The host package was done with by the time the failure came out.
+        mock_decompress.assert_called_once_with(
+            "%s/cvd-host_package.tar.gz" % self._extract_path,
+            self._extract_path)
+
     @mock.patch.object(subprocess, "check_call")
     def testUnpackBootImage(self, mock_call):
         """Test Unpack boot image."""
@@ -86,8 +86,12 @@ class AdbTools(object):
 
         adb_cmd = [self._adb_command, _ADB_DEVICE]
         device_info = subprocess.check_output(adb_cmd)
+        # Compile once per call rather than per line. The serial is escaped so
+        # its dots can't match arbitrary chars of another device's serial.
+        re_device = re.compile(r"%s\s(?P<adb_status>.+)" %
+                               re.escape(self._device_serial))
         for device in device_info.splitlines():
-            match = re.match(r"%s\s(?P<adb_status>.+)" % self._device_serial, device)
+            match = re_device.match(device)
             if match:
                 return match.group("adb_status")
         return None
@@ -27,6 +27,8 @@ class AdbToolsTest(driver_test_lib.BaseDriverTest):
     DEVICE_OFFLINE = ("List of devices attached\n"
                       "127.0.0.1:48451 offline")
     DEVICE_NONE = ("List of devices attached")
+    DEVICE_SIMILAR = ("List of devices attached\n"
+                      "127a0a0a1:48451 device")
 
     # pylint: disable=no-member
     def testGetAdbConnectionStatus(self):
@@ -42,6 +44,9 @@ class AdbToolsTest(driver_test_lib.BaseDriverTest):
         self.Patch(subprocess, "check_output", return_value=self.DEVICE_NONE)
         self.assertEqual(adb_cmd.GetAdbConnectionStatus(), None)
 
+        self.Patch(subprocess, "check_output", return_value=self.DEVICE_SIMILAR)
+        self.assertEqual(adb_cmd.GetAdbConnectionStatus(), None)
+
     # pylint: disable=no-member,protected-access
     def testConnectAdb(self):
         """Test connect adb."""
@@ -81,13 +81,14 @@ class CheepsComputeClient(android_compute_client.AndroidComputeClient):
 
         # Update metadata by avd_spec
         if avd_spec:
-            metadata["cvd_01_x_res"] = avd_spec.hw_property[constants.HW_X_RES]
-            metadata["cvd_01_y_res"] = avd_spec.hw_property[constants.HW_Y_RES]
-            metadata["cvd_01_dpi"] = avd_spec.hw_property[constants.HW_ALIAS_DPI]
+            hw_property = avd_spec.hw_property
+            metadata["cvd_01_x_res"] = hw_property[constants.HW_X_RES]
+            metadata["cvd_01_y_res"] = hw_property[constants.HW_Y_RES]
+            metadata["cvd_01_dpi"] = hw_property[constants.HW_ALIAS_DPI]
             metadata[constants.INS_KEY_DISPLAY] = ("%sx%s (%s)" % (
-                avd_spec.hw_property[constants.HW_X_RES],
-                avd_spec.hw_property[constants.HW_Y_RES],
-                avd_spec.hw_property[constants.HW_ALIAS_DPI]))
+                hw_property[constants.HW_X_RES],
+                hw_property[constants.HW_Y_RES],
+                hw_property[constants.HW_ALIAS_DPI]))
 
         # Add per-instance ssh key
         if self._ssh_public_key_path:
@@ -47,6 +47,13 @@ from acloud.internal.lib import utils
 
 logger = logging.getLogger(__name__)
 
+# Pairs of (metadata key, hw_property key) copied from the avd_spec.
+_HW_PROPERTY_METADATA_MAP = (
+    ("cvd_01_x_res", constants.HW_X_RES),
+    ("cvd_01_y_res", constants.HW_Y_RES),
+    ("cvd_01_dpi", constants.HW_ALIAS_DPI),
+    ("cvd_01_blank_data_disk_size", constants.HW_ALIAS_DISK))
+
 
 class CvdComputeClient(android_compute_client.AndroidComputeClient):
     """Client that manages Anadroid Virtual Device."""
@@ -125,20 +132,18 @@ class CvdComputeClient(android_compute_client.AndroidComputeClient):
         # TODO(b/118406018): deprecate resolution config and use hw_proprty for
         # all create cmds.
         if avd_spec:
+            hw_property = avd_spec.hw_property
             metadata[constants.INS_KEY_AVD_TYPE] = avd_spec.avd_type
             metadata[constants.INS_KEY_AVD_FLAVOR] = avd_spec.flavor
-            metadata["cvd_01_x_res"] = avd_spec.hw_property[constants.HW_X_RES]
-            metadata["cvd_01_y_res"] = avd_spec.hw_property[constants.HW_Y_RES]
-            metadata["cvd_01_dpi"] = avd_spec.hw_property[constants.HW_ALIAS_DPI]
-            metadata["cvd_01_blank_data_disk_size"] = avd_spec.hw_property[
-                constants.HW_ALIAS_DISK]
+            for metadata_key, hw_key in _HW_PROPERTY_METADATA_MAP:
+                metadata[metadata_key] = hw_property[hw_key]
             # Use another METADATA_DISPLAY to record resolution which will be
             # retrieved in acloud list cmd. We try not to use cvd_01_x_res
             # since cvd_01_xxx metadata is going to deprecated by cuttlefish.
             metadata[constants.INS_KEY_DISPLAY] = ("%sx%s (%s)" % (
-                avd_spec.hw_property[constants.HW_X_RES],
-                avd_spec.hw_property[constants.HW_Y_RES],
-                avd_spec.hw_property[constants.HW_ALIAS_DPI]))
+                hw_property[constants.HW_X_RES],
+                hw_property[constants.HW_Y_RES],
+                hw_property[constants.HW_ALIAS_DPI]))
         else:
             resolution = self._resolution.split("x")
             metadata["cvd_01_dpi"] = resolution[3]
@@ -183,14 +183,15 @@ class GoldfishComputeClient(android_compute_client.AndroidComputeClient):
         # for legacy create_gf cmd, we will keep using resolution.
         # And always use avd_spec for acloud create cmd.
         if avd_spec:
+            hw_property = avd_spec.hw_property
             metadata[constants.INS_KEY_AVD_FLAVOR] = avd_spec.flavor
-            metadata["cvd_01_x_res"] = avd_spec.hw_property[constants.HW_X_RES]
-            metadata["cvd_01_y_res"] = avd_spec.hw_property[constants.HW_Y_RES]
-            metadata["cvd_01_dpi"] = avd_spec.hw_property[constants.HW_ALIAS_DPI]
+            metadata["cvd_01_x_res"] = hw_property[constants.HW_X_RES]
+            metadata["cvd_01_y_res"] = hw_property[constants.HW_Y_RES]
+            metadata["cvd_01_dpi"] = hw_property[constants.HW_ALIAS_DPI]
             metadata[constants.INS_KEY_DISPLAY] = ("%sx%s (%s)" % (
-                avd_spec.hw_property[constants.HW_X_RES],
-                avd_spec.hw_property[constants.HW_Y_RES],
-                avd_spec.hw_property[constants.HW_ALIAS_DPI]))
+                hw_property[constants.HW_X_RES],
+                hw_property[constants.HW_Y_RES],
+                hw_property[constants.HW_ALIAS_DPI]))
         else:
             resolution = self._resolution.split("x")
             metadata["cvd_01_x_res"] = resolution[0]
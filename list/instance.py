@@ -57,8 +57,8 @@ _RE_LAUNCH_CVD = re.compile(r"(?P<date_str>^[^/]+)(.*launch_cvd --daemon )+"
                             r"((.*\s*-dpi\s)(?P<dpi>\d+))?"
                             r"((.*\s*-memory_mb\s)(?P<memory>\d+))?"
                             r"((.*\s*-blank_data_image_mb\s)(?P<disk>\d+))?")
-_FULL_NAME_STRING = ("device serial: %(device_serial)s (%(instance_name)s) "
-                     "elapsed time: %(elapsed_time)s")
+# Positional fields: device serial, instance name, elapsed time.
+_FULL_NAME_STRING = "device serial: %s (%s) elapsed time: %s"
 
 
 def _GetElapsedTime(start_time):
@@ -220,10 +220,9 @@ class LocalInstance(Instance):
                 local_instance._createtime = date_str
                 local_instance._elapsed_time = _GetElapsedTime(date_str)
                 local_instance._fullname = (_FULL_NAME_STRING %
-                                            {"device_serial": "127.0.0.1:%d" %
-                                                              constants.CF_ADB_PORT,
-                                             "instance_name": local_instance._name,
-                                             "elapsed_time": local_instance._elapsed_time})
+                                            ("127.0.0.1:%d" % constants.CF_ADB_PORT,
+                                             local_instance._name,
+                                             local_instance._elapsed_time))
                 local_instance._avd_type = constants.TYPE_CF
                 local_instance._ip = "127.0.0.1"
                 local_instance._status = constants.INS_STATUS_RUNNING
@@ -302,22 +301,15 @@ class RemoteInstance(Instance):
 
             adb_device = AdbTools(self._adb_port)
             if adb_device.IsAdbConnected():
-                self._fullname = (_FULL_NAME_STRING %
-                                  {"device_serial": "127.0.0.1:%d" % self._adb_port,
-                                   "instance_name": self._name,
-                                   "elapsed_time": self._elapsed_time})
+                device_serial = "127.0.0.1:%d" % self._adb_port
             else:
-                self._fullname = (_FULL_NAME_STRING %
-                                  {"device_serial": "not connected",
-                                   "instance_name": self._name,
-                                   "elapsed_time": self._elapsed_time})
+                device_serial = "not connected"
         # If instance is terminated, its ip is None.
         else:
             self._ssh_tunnel_is_connected = False
-            self._fullname = (_FULL_NAME_STRING %
-                              {"device_serial": "terminated",
-                               "instance_name": self._name,
-                               "elapsed_time": self._elapsed_time})
+            device_serial = "terminated"
+        self._fullname = _FULL_NAME_STRING % (device_serial, self._name,
+                                              self._elapsed_time)
 
     @staticmethod
     def GetAdbVncPortFromSSHTunnel(ip, avd_type):
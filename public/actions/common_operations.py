@@ -34,6 +34,14 @@ from acloud.internal.lib import utils
 
 logger = logging.getLogger(__name__)
 
+# Pairs of (report key, device factory attribute) for the build info of
+# each device.
+_BUILD_INFO_ATTRS = tuple(
+    (attr, "_%s" % attr) for attr in (
+        "branch", "build_target", "build_id", "kernel_branch",
+        "kernel_build_target", "kernel_build_id", "emulator_branch",
+        "emulator_build_target", "emulator_build_id"))
+
 
 def CreateSshKeyPairIfNecessary(cfg):
     """Create ssh key pair if necessary.
@@ -293,12 +301,10 @@ def CreateDevices(command, cfg, device_factory, num, avd_type,
                 "ip": ip,
                 "instance_name": device.instance_name
             }
-            for attr in ("branch", "build_target", "build_id", "kernel_branch",
-                         "kernel_build_target", "kernel_build_id",
-                         "emulator_branch", "emulator_build_target",
-                         "emulator_build_id"):
-                if getattr(device_factory, "_%s" % attr, None):
-                    device_dict[attr] = getattr(device_factory, "_%s" % attr)
+            for attr, factory_attr in _BUILD_INFO_ATTRS:
+                value = getattr(device_factory, factory_attr, None)
+                if value:
+                    device_dict[attr] = value
             if autoconnect:
                 forwarded_ports = utils.AutoConnect(
                     ip, cfg.ssh_private_key_path,
@@ -47,9 +47,9 @@ class CuttlefishDeviceFactory(base_device_factory.BaseDeviceFactory):
 
     RELEASE_BRANCH_SUFFIX = "-release"
     RELEASE_BRANCH_PATH_GLOB_PATTERN = "*-%s"
-    LOG_FILES = ["/home/vsoc-01/cuttlefish_runtime/kernel.log",
+    LOG_FILES = ("/home/vsoc-01/cuttlefish_runtime/kernel.log",
                  "/home/vsoc-01/cuttlefish_runtime/logcat",
-                 "/home/vsoc-01/cuttlefish_runtime/cuttlefish_config.json"]
+                 "/home/vsoc-01/cuttlefish_runtime/cuttlefish_config.json")
 
     def __init__(self, cfg, build_target, build_id, kernel_build_id=None,
                  avd_spec=None, kernel_branch=None):
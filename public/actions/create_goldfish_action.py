@@ -18,8 +18,10 @@
 A Goldfish device is an emulated android device based on the android
 emulator.
 """
+import errno
 import logging
 import os
+import tempfile
 
 from acloud import errors
 from acloud.public.actions import base_device_factory
@@ -28,7 +30,6 @@ from acloud.internal import constants
 from acloud.internal.lib import android_build_client
 from acloud.internal.lib import auth
 from acloud.internal.lib import goldfish_compute_client
-from acloud.internal.lib import utils
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,11 @@ _EMULATOR_INFO_FILENAME = "emulator-info.txt"
 _EMULATOR_VERSION_PATTERN = "version-emulator"
 _SYSIMAGE_INFO_FILENAME = "android-info.txt"
 _SYSIMAGE_VERSION_PATTERN = "version-sysimage-{}-{}"
+# Build info files never change for a given build, keep them around so
+# repeated create_gf runs don't download them again. The cache is per user,
+# a shared dir would let other users choose which build ids we deploy.
+_BUILD_INFO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache",
+                                     "acloud", "build_info")
 
 
 class GoldfishDeviceFactory(base_device_factory.BaseDeviceFactory):
@@ -53,10 +59,10 @@ class GoldfishDeviceFactory(base_device_factory.BaseDeviceFactory):
         _branch: String, android branch name, e.g. git_master
         _emulator_branch: String, emulator branch name, e.g. "aosp-emu-master-dev"
     """
-    LOG_FILES = ["/home/vsoc-01/emulator.log",
+    LOG_FILES = ("/home/vsoc-01/emulator.log",
                  "/home/vsoc-01/log/logcat.log",
                  "/home/vsoc-01/log/adb.log",
-                 "/var/log/daemon.log"]
+                 "/var/log/daemon.log")
 
     def __init__(self,
                  cfg,
@@ -65,7 +71,9 @@ class GoldfishDeviceFactory(base_device_factory.BaseDeviceFactory):
                  emulator_build_target,
                  emulator_build_id,
                  gpu=None,
-                 avd_spec=None):
+                 avd_spec=None,
+                 build_client=None,
+                 credentials=None):
 
         """Initialize.
 
@@ -77,9 +85,13 @@ class GoldfishDeviceFactory(base_device_factory.BaseDeviceFactory):
             emulator_build_id: String, emulator build id.
             gpu: String, GPU to attach to the device or None. e.g. "nvidia-tesla-k80"
             avd_spec: An AVDSpec instance.
+            build_client: An AndroidBuildClient instance to reuse. A new one
+                          is created if None.
+            credentials: An oauth2client.OAuth2Credentials instance to reuse.
+                         New credentials are created from cfg if None.
         """
 
-        self.credentials = auth.CreateCredentials(cfg)
+        self.credentials = credentials or auth.CreateCredentials(cfg)
 
         compute_client = goldfish_compute_client.GoldfishComputeClient(
             cfg, self.credentials)
@@ -97,8 +109,9 @@ class GoldfishDeviceFactory(base_device_factory.BaseDeviceFactory):
         self._extra_scopes = cfg.extra_scopes
 
         # Configure clients
-        self._build_client = android_build_client.AndroidBuildClient(
-            self.credentials)
+        self._build_client = (
+            build_client or
+            android_build_client.AndroidBuildClient(self.credentials))
 
         # Discover branches
         self._branch = self._build_client.GetBranch(build_target, build_id)
@@ -149,23 +162,34 @@ def ParseBuildInfo(filename, pattern):
 
     Returns:
         Build id parsed from the file based on pattern
-        Returns None if pattern not found in file
+        Returns None if pattern not found in file or its line has no "="
     """
+    # The info files are small, search the whole content with one find
+    # instead of checking every line.
     with open(filename) as build_info_file:
-        for line in build_info_file:
-            if pattern in line:
-                return line.rstrip().split("=")[1]
-    return None
-
-
-def _FetchBuildIdFromFile(cfg, build_target, build_id, pattern, filename):
+        content = build_info_file.read()
+    index = content.find(pattern)
+    if index < 0:
+        return None
+    line_start = content.rfind("\n", 0, index) + 1
+    line_end = content.find("\n", index)
+    if line_end < 0:
+        line_end = len(content)
+    _, separator, build_id = content[line_start:line_end].rstrip().partition(
+        "=")
+    return build_id if separator else None
+
+
+def _FetchBuildIdFromFile(build_client, build_target, build_id, pattern,
+                          filename):
     """Parse and fetch build id from a file based on a pattern.
 
     Verify if one of the system image or emulator binary build id is missing.
-    If found missing, then update according to the resource file.
+    If found missing, then update according to the resource file. The file is
+    cached under _BUILD_INFO_CACHE_DIR so it's only downloaded once per build.
 
     Args:
-        cfg: An AcloudConfig instance.
+        build_client: An AndroidBuildClient instance.
         build_target: Target name.
         build_id: Build id, a string, e.g. "2263051", "P2804227"
         pattern: A string to parse build info file.
@@ -174,17 +198,33 @@ def _FetchBuildIdFromFile(cfg, build_target, build_id, pattern, filename):
     Returns:
         A build id or None
     """
-    build_client = android_build_client.AndroidBuildClient(
-        auth.CreateCredentials(cfg))
-
-    with utils.TempDir() as tempdir:
-        temp_filename = os.path.join(tempdir, filename)
-        build_client.DownloadArtifact(build_target,
-                                      build_id,
-                                      filename,
-                                      temp_filename)
-
-        return ParseBuildInfo(temp_filename, pattern)
+    cache_path = os.path.join(_BUILD_INFO_CACHE_DIR, build_target, build_id,
+                              filename)
+    if not os.path.exists(cache_path):
+        cache_dir = os.path.dirname(cache_path)
+        try:
+            os.makedirs(cache_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        # Download to a temp file next to the cache entry and rename it into
+        # place, an interrupted download must not leave a partial file in the
+        # cache. The temp file is created 0600 and keeps that mode after the
+        # rename, which is only fine because the cache is private to the user.
+        temp_file = tempfile.NamedTemporaryFile(dir=cache_dir, prefix=filename,
+                                                delete=False)
+        temp_file.close()
+        try:
+            build_client.DownloadArtifact(build_target,
+                                          build_id,
+                                          filename,
+                                          temp_file.name)
+            os.rename(temp_file.name, cache_path)
+        finally:
+            if os.path.exists(temp_file.name):
+                os.remove(temp_file.name)
+
+    return ParseBuildInfo(cache_path, pattern)
 
 
 def CreateDevices(avd_spec=None,
@@ -233,11 +273,16 @@ def CreateDevices(avd_spec=None,
         autoconnect = avd_spec.autoconnect
         report_internal_ip = avd_spec.report_internal_ip
 
+    # One set of credentials and one build client serve the build info
+    # lookups and the device factory.
+    credentials = auth.CreateCredentials(cfg)
+    build_client = android_build_client.AndroidBuildClient(credentials)
+
     if emulator_build_id is None:
         logger.info("emulator_build_id not provided. "
                     "Try to get %s from build %s/%s.", _EMULATOR_INFO_FILENAME,
                     build_id, build_target)
-        emulator_build_id = _FetchBuildIdFromFile(cfg,
+        emulator_build_id = _FetchBuildIdFromFile(build_client,
                                                   build_target,
                                                   build_id,
                                                   _EMULATOR_VERSION_PATTERN,
@@ -249,7 +294,7 @@ def CreateDevices(avd_spec=None,
 
     if build_id is None:
         pattern = _SYSIMAGE_VERSION_PATTERN.format(branch, build_target)
-        build_id = _FetchBuildIdFromFile(cfg,
+        build_id = _FetchBuildIdFromFile(build_client,
                                          cfg.emulator_build_target,
                                          emulator_build_id,
                                          pattern,
@@ -267,7 +312,9 @@ def CreateDevices(avd_spec=None,
 
     device_factory = GoldfishDeviceFactory(cfg, build_target, build_id,
                                            cfg.emulator_build_target,
-                                           emulator_build_id, gpu, avd_spec)
+                                           emulator_build_id, gpu, avd_spec,
+                                           build_client=build_client,
+                                           credentials=credentials)
 
     return common_operations.CreateDevices("create_gf", cfg, device_factory,
                                            num, constants.TYPE_GF,
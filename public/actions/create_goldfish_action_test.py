@@ -14,10 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for acloud.public.actions.create_goldfish_actions."""
+import os
 import uuid
 import unittest
 import mock
 
+from acloud import errors
 from acloud.internal import constants
 from acloud.internal.lib import android_build_client
 from acloud.internal.lib import android_compute_client
@@ -25,6 +27,7 @@ from acloud.internal.lib import auth
 from acloud.internal.lib import driver_test_lib
 from acloud.internal.lib import gcompute_client
 from acloud.internal.lib import goldfish_compute_client
+from acloud.internal.lib import utils
 from acloud.public.actions import create_goldfish_action
 
 
@@ -146,6 +149,9 @@ class CreateGoldfishActionTest(driver_test_lib.BaseDriverTest):
         })
         self.assertEquals(report.command, "create_gf")
         self.assertEquals(report.status, "SUCCESS")
+        # The credentials and build client are shared with the device factory.
+        self.assertEqual(auth.CreateCredentials.call_count, 1)
+        self.assertEqual(android_build_client.AndroidBuildClient.call_count, 1)
 
         # Call CreateDevices with avd_spec
         self.build_client.GetBranch.side_effect = [
@@ -333,6 +339,73 @@ class CreateGoldfishActionTest(driver_test_lib.BaseDriverTest):
             avd_spec=self.avd_spec,
             extra_scopes=self.EXTRA_SCOPES)
 
+    def testParseBuildInfo(self):
+        """Test ParseBuildInfo."""
+        with utils.TempDir() as tempdir:
+            info_file = os.path.join(tempdir, "android-info.txt")
+            with open(info_file, "w") as f:
+                f.write("require board=goldfish\n"
+                        "require version-sysimage-git_master-sdk=1234\n"
+                        "require version-emulator=5678\n"
+                        "require version-no-separator")
+            self.assertEqual(create_goldfish_action.ParseBuildInfo(
+                info_file, "version-sysimage-git_master-sdk"), "1234")
+            self.assertEqual(create_goldfish_action.ParseBuildInfo(
+                info_file, "version-emulator"), "5678")
+            self.assertEqual(create_goldfish_action.ParseBuildInfo(
+                info_file, "version-unknown"), None)
+            self.assertEqual(create_goldfish_action.ParseBuildInfo(
+                info_file, "version-no-separator"), None)
+
+    # pylint: disable=protected-access
+    def testFetchBuildIdFromFile(self):
+        """Test _FetchBuildIdFromFile downloads the build info only once."""
+        def _FakeDownload(build_target, build_id, resource_id, local_dest):
+            """Write a fake emulator-info.txt to local_dest."""
+            del build_target, build_id, resource_id
+            with open(local_dest, "w") as info_file:
+                info_file.write("require version-emulator=%s\n" %
+                                self.EMULATOR_BUILD_ID)
+
+        self.build_client.DownloadArtifact.side_effect = _FakeDownload
+        with utils.TempDir() as tempdir:
+            self.Patch(create_goldfish_action, "_BUILD_INFO_CACHE_DIR",
+                       os.path.join(tempdir, "build_info"))
+            for _ in range(2):
+                self.assertEqual(
+                    create_goldfish_action._FetchBuildIdFromFile(
+                        self.build_client, self.BUILD_TARGET, self.BUILD_ID,
+                        "version-emulator", "emulator-info.txt"),
+                    self.EMULATOR_BUILD_ID)
+        self.assertEqual(self.build_client.DownloadArtifact.call_count, 1)
+
+    # pylint: disable=protected-access
+    def testFetchBuildIdFromFileDownloadFailure(self):
+        """Test a failed download leaves nothing in the build info cache."""
+        self.build_client.DownloadArtifact.side_effect = errors.DriverError(
+            "download failed")
+        with utils.TempDir() as tempdir:
+            cache_dir = os.path.join(tempdir, "build_info")
+            self.Patch(create_goldfish_action, "_BUILD_INFO_CACHE_DIR",
+                       cache_dir)
+            self.assertRaises(errors.DriverError,
+                              create_goldfish_action._FetchBuildIdFromFile,
+                              self.build_client, self.BUILD_TARGET,
+                              self.BUILD_ID, "version-emulator",
+                              "emulator-info.txt")
+            self.assertEqual(
+                os.listdir(os.path.join(cache_dir, self.BUILD_TARGET,
+                                        self.BUILD_ID)), [])
+
+            # The cache dir already exists on retry.
+            self.build_client.DownloadArtifact.side_effect = None
+            create_goldfish_action._FetchBuildIdFromFile(
+                self.build_client, self.BUILD_TARGET, self.BUILD_ID,
+                "version-emulator", "emulator-info.txt")
+            self.assertEqual(
+                os.listdir(os.path.join(cache_dir, self.BUILD_TARGET,
+                                        self.BUILD_ID)), ["emulator-info.txt"])
+
 
 if __name__ == "__main__":
     unittest.main()